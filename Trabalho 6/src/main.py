@@ -1,7 +1,14 @@
-import autogen
-from typing import List, Dict
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import List, Dict, Iterable, Iterator, Optional, Tuple
+import hashlib
+import itertools
 import json
+import math
 import os
+import re
+import sys
+import time
 from datetime import datetime
 
 # Configuração da API (você deve configurar sua chave da OpenAI)
@@ -9,12 +16,38 @@ config_list = [
     {"model": "gpt-4", "api_key": os.environ.get("OPENAI_API_KEY", "sua-chave-aqui")}
 ]
 
+# Permite apontar para um servidor compatível com a API da OpenAI (ex.: stub local)
+if os.environ.get("OPENAI_BASE_URL"):
+    config_list[0]["base_url"] = os.environ["OPENAI_BASE_URL"]
+
 llm_config = {
     "config_list": config_list,
     "temperature": 0.7,
     "timeout": 120,
 }
 
+# Configuração do pipeline assíncrono (coletor → analisador → relator)
+pipeline_config = {
+    "max_concorrencia": 8,  # chamadas simultâneas ao modelo
+    "posts_por_lote": 5,  # posts enviados em um único prompt do analisador
+    "tentativas": 3,  # tentativas por lote antes de usar o fallback
+    "backoff_inicial": 1.0,  # segundos; dobra a cada nova tentativa
+    "timeout": llm_config["timeout"],  # limite por chamada, em segundos
+}
+
+PROMPT_ANALISADOR = """Você é o Agente Analisador de Sentimentos.
+            Sua função é:
+            1. Receber posts individuais
+            2. Analisar o sentimento (POSITIVO, NEGATIVO ou NEUTRO)
+            3. Fornecer uma breve justificativa da análise
+            4. Atribuir uma pontuação de confiança (0-100%)
+            
+            Formato de resposta:
+            SENTIMENTO: [POSITIVO/NEGATIVO/NEUTRO]
+            CONFIANÇA: [0-100]%
+            JUSTIFICATIVA: [breve explicação]
+            """
+
 # Posts simulados para análise
 POSTS_SIMULADOS = [
     "Adorei o novo produto! Qualidade excepcional e entrega rápida!",
@@ -30,84 +63,835 @@ POSTS_SIMULADOS = [
 ]
 
 
-class SistemaAnaliseMultiAgente:
-    """Sistema principal que coordena os agentes"""
+# Agentes e clientes do modelo compartilhados entre instâncias, criados no primeiro uso
+_pool_agentes: Dict = {}
+_pool_clientes: Dict = {}
+
+
+def obter_agentes() -> Dict:
+    """Retorna os agentes do sistema, criando-os (e importando o AutoGen) uma única vez
+
+    Os agentes ficam em um pool do módulo e são compartilhados por todas as
+    instâncias de SistemaAnaliseMultiAgente do processo.
+    """
+    if _pool_agentes:
+        return _pool_agentes
+
+    import autogen
+
+    # O pool só é publicado depois que todos os agentes forem criados; se um
+    # construtor falhar, o próximo acesso tenta de novo e exibe o erro real
+    agentes = {}
+
+    # 1. AGENTE COLETOR - Responsável por coletar e preparar os dados
+    agentes["AgenteColetor"] = autogen.AssistantAgent(
+        name="AgenteColetor",
+        system_message="""Você é o Agente Coletor de Dados.
+        Sua função é:
+        1. Receber posts de redes sociais
+        2. Organizar e estruturar os dados
+        3. Enviar os posts um por um para análise
+        4. Manter registro de todos os posts processados
+        
+        Sempre responda em formato estruturado e claro.
+        """,
+        llm_config=llm_config,
+    )
+
+    # 2. AGENTE ANALISADOR - Analisa o sentimento de cada post
+    agentes["AgenteAnalisador"] = autogen.AssistantAgent(
+        name="AgenteAnalisador",
+        system_message=PROMPT_ANALISADOR,
+        llm_config=llm_config,
+    )
+
+    # 3. AGENTE RELATOR - Gera relatório final com estatísticas
+    agentes["AgenteRelator"] = autogen.AssistantAgent(
+        name="AgenteRelator",
+        system_message="""Você é o Agente Relator.
+        Sua função é:
+        1. Receber todos os resultados das análises
+        2. Calcular estatísticas gerais
+        3. Gerar um relatório consolidado
+        4. Fornecer insights e recomendações
+        
+        Sempre inclua:
+        - Percentual de cada sentimento
+        - Total de posts analisados
+        - Tendência geral
+        - Recomendações baseadas nos dados
+        """,
+        llm_config=llm_config,
+    )
+
+    # Agente Usuário para coordenação
+    agentes["Coordenador"] = autogen.UserProxyAgent(
+        name="Coordenador",
+        human_input_mode="NEVER",
+        max_consecutive_auto_reply=10,
+        code_execution_config={"use_docker": False},
+    )
+
+    _pool_agentes.update(agentes)
+    return _pool_agentes
+
+
+def obter_cliente_llm():
+    """Retorna o cliente assíncrono do modelo, compartilhado até fechar_clientes_llm"""
+    configuracao = config_list[0]
+    chave = (configuracao["api_key"], configuracao.get("base_url"))
+    if chave not in _pool_clientes:
+        from openai import AsyncOpenAI
+
+        # As novas tentativas são controladas pelo próprio pipeline
+        _pool_clientes[chave] = AsyncOpenAI(
+            api_key=configuracao["api_key"],
+            base_url=configuracao.get("base_url"),
+            max_retries=0,
+        )
+    return _pool_clientes[chave]
+
+
+async def fechar_clientes_llm():
+    """Fecha os clientes do modelo; o cliente HTTP fica preso ao event loop atual"""
+    while _pool_clientes:
+        _, cliente = _pool_clientes.popitem()
+        await cliente.close()
+
+
+def _erro_transitorio(erro: Exception) -> bool:
+    """Indica se a falha ao consultar o modelo pode ser resolvida com nova tentativa"""
+    import asyncio
+
+    if isinstance(erro, asyncio.TimeoutError):
+        return True
+
+    import openai
+
+    # APITimeoutError é subclasse de APIConnectionError; InternalServerError
+    # cobre as respostas 5xx
+    return isinstance(
+        erro,
+        (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError),
+    )
+
+
+# Campos aceitos como texto do post em entradas JSONL/CSV
+CAMPOS_TEXTO = ("post", "texto", "text", "content")
+
+
+def _extrair_texto(registro, campos: Tuple[str, ...] = CAMPOS_TEXTO) -> Optional[str]:
+    """Obtém o texto do post de um registro JSON (string ou objeto)"""
+    if isinstance(registro, str):
+        return registro
+    if isinstance(registro, dict):
+        for campo in campos:
+            if registro.get(campo):
+                return str(registro[campo])
+    return None
+
+
+def ler_posts(
+    caminho: str, formato: str = "auto", coluna: Optional[str] = None
+) -> Iterator[str]:
+    """Lê posts sob demanda de um arquivo JSONL/CSV/texto ou da entrada padrão ("-")
+
+    O texto vem do campo/coluna informado ou do primeiro nome em CAMPOS_TEXTO.
+    Em CSV a primeira linha é sempre o cabeçalho; se nenhuma coluna de texto
+    for encontrada nele, ValueError é levantado já nesta chamada.
+    """
+    if formato == "auto":
+        extensao = os.path.splitext(caminho)[1].lower()
+        if extensao in (".jsonl", ".ndjson"):
+            formato = "jsonl"
+        elif extensao == ".csv":
+            formato = "csv"
+        else:
+            formato = "texto"
+
+    campos = (coluna,) if coluna else CAMPOS_TEXTO
+    arquivo = (
+        sys.stdin
+        if caminho == "-"
+        else open(caminho, "r", encoding="utf-8", newline="")
+    )
+
+    if formato != "csv":
+        return _ler_linhas(arquivo, formato, campos)
+
+    try:
+        import csv
+
+        leitor = csv.reader(arquivo)
+        cabecalho = next(leitor, None)
+        posicao = None
+        if cabecalho is not None:
+            nomes = [nome.strip().lower() for nome in cabecalho]
+            posicao = next(
+                (nomes.index(campo.lower()) for campo in campos if campo.lower() in nomes),
+                None,
+            )
+            if posicao is None:
+                raise ValueError(
+                    f"{caminho}: nenhuma coluna de texto no cabeçalho "
+                    f"{cabecalho} (esperado: {', '.join(campos)}); use --coluna"
+                )
+    except BaseException:
+        _fechar_entrada(arquivo)
+        raise
+
+    return _ler_csv(arquivo, leitor, posicao)
+
+
+def _fechar_entrada(arquivo):
+    """Fecha o arquivo de entrada, exceto a entrada padrão"""
+    if arquivo is not sys.stdin:
+        arquivo.close()
+
+
+def _ler_csv(arquivo, leitor, posicao: Optional[int]) -> Iterator[str]:
+    """Percorre as linhas de dados de um CSV já posicionado após o cabeçalho"""
+    try:
+        if posicao is None:
+            return
+        for linha in leitor:
+            if len(linha) > posicao and linha[posicao].strip():
+                yield linha[posicao].strip()
+    finally:
+        _fechar_entrada(arquivo)
+
+
+def _ler_linhas(arquivo, formato: str, campos: Tuple[str, ...]) -> Iterator[str]:
+    """Percorre uma entrada JSONL ou de texto com um post por linha"""
+    try:
+        for linha in arquivo:
+            linha = linha.strip()
+            if not linha:
+                continue
+            # No formato texto, linhas que parecem JSON também são aceitas
+            if formato == "jsonl" or linha[0] in "{\"":
+                try:
+                    texto = _extrair_texto(json.loads(linha), campos)
+                except json.JSONDecodeError:
+                    if formato == "jsonl":
+                        print(f"Linha JSON inválida ignorada: {linha[:60]}")
+                        continue
+                    texto = linha
+            else:
+                texto = linha
+
+            if texto:
+                yield texto
+    finally:
+        _fechar_entrada(arquivo)
+
+
+class HistogramaLatencia:
+    """Histograma de latências com baldes fixos (memória constante)"""
+
+    # Limites superiores dos baldes, em segundos
+    LIMITES = (
+        0.00001, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05,
+        0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, math.inf,
+    )
 
     def __init__(self):
-        """Inicializa o sistema e cria os agentes"""
-        self.posts = POSTS_SIMULADOS
-        self.resultados = []
-        self.criar_agentes()
+        self.contagens = [0] * len(self.LIMITES)
+        self.total = 0
+        self.soma = 0.0
+        self.maximo = 0.0
 
-    def criar_agentes(self):
-        """Cria os três agentes do sistema"""
+    def registrar(self, duracao: float):
+        """Conta uma medição no primeiro balde que a comporta"""
+        for posicao, limite in enumerate(self.LIMITES):
+            if duracao <= limite:
+                self.contagens[posicao] += 1
+                break
+        self.total += 1
+        self.soma += duracao
+        self.maximo = max(self.maximo, duracao)
 
-        # 1. AGENTE COLETOR - Responsável por coletar e preparar os dados
-        self.agente_coletor = autogen.AssistantAgent(
-            name="AgenteColetor",
-            system_message="""Você é o Agente Coletor de Dados.
-            Sua função é:
-            1. Receber posts de redes sociais
-            2. Organizar e estruturar os dados
-            3. Enviar os posts um por um para análise
-            4. Manter registro de todos os posts processados
-            
-            Sempre responda em formato estruturado e claro.
-            """,
-            llm_config=llm_config,
+    def percentil(self, fracao: float) -> float:
+        """Estimativa do percentil por interpolação linear dentro do balde"""
+        if self.total == 0:
+            return 0.0
+
+        alvo = fracao * self.total
+        acumulado = 0
+        inferior = 0.0
+        for limite, contagem in zip(self.LIMITES, self.contagens):
+            if contagem and acumulado + contagem >= alvo:
+                superior = min(limite, self.maximo)
+                return inferior + (superior - inferior) * (alvo - acumulado) / contagem
+            acumulado += contagem
+            inferior = limite
+
+        return self.maximo
+
+    def resumo(self) -> Dict:
+        """Contagem, média e percentis p50/p95/p99 em segundos"""
+        return {
+            "chamadas": self.total,
+            "total_s": round(self.soma, 6),
+            "media_s": round(self.soma / self.total, 6) if self.total else 0.0,
+            "p50_s": round(self.percentil(0.50), 6),
+            "p95_s": round(self.percentil(0.95), 6),
+            "p99_s": round(self.percentil(0.99), 6),
+            "max_s": round(self.maximo, 6),
+        }
+
+
+class MetricasPipeline:
+    """Tempos por etapa, vazão e profundidade das filas do pipeline
+
+    Etapas: coleta (leitura de cada post), espera_modelo (espera por uma
+    vaga de chamada ao modelo), analise (cada post no modo sequencial, cada
+    chamada ao modelo no assíncrono), gravacao (cada lote gravado pelo
+    EscritorResultados), relatorio e salvamento (gravação final).
+    """
+
+    def __init__(self):
+        self.etapas: Dict[str, HistogramaLatencia] = {}
+        self.filas: Dict[str, Dict] = {}
+        self.posts_processados = 0
+        self.inicio = time.monotonic()
+
+    @contextmanager
+    def medir(self, etapa: str):
+        """Mede a duração do bloco e a registra na etapa informada"""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.registrar(etapa, time.perf_counter() - inicio)
+
+    def registrar(self, etapa: str, duracao: float):
+        """Registra a duração de uma execução da etapa"""
+        if etapa not in self.etapas:
+            self.etapas[etapa] = HistogramaLatencia()
+        self.etapas[etapa].registrar(duracao)
+
+    def registrar_fila(self, fila: str, profundidade: int):
+        """Registra a profundidade atual de uma fila"""
+        estatisticas = self.filas.setdefault(
+            fila, {"atual": 0, "maxima": 0, "soma": 0, "amostras": 0}
         )
+        estatisticas["atual"] = profundidade
+        estatisticas["maxima"] = max(estatisticas["maxima"], profundidade)
+        estatisticas["soma"] += profundidade
+        estatisticas["amostras"] += 1
 
-        # 2. AGENTE ANALISADOR - Analisa o sentimento de cada post
-        self.agente_analisador = autogen.AssistantAgent(
-            name="AgenteAnalisador",
-            system_message="""Você é o Agente Analisador de Sentimentos.
-            Sua função é:
-            1. Receber posts individuais
-            2. Analisar o sentimento (POSITIVO, NEGATIVO ou NEUTRO)
-            3. Fornecer uma breve justificativa da análise
-            4. Atribuir uma pontuação de confiança (0-100%)
-            
-            Formato de resposta:
-            SENTIMENTO: [POSITIVO/NEGATIVO/NEUTRO]
-            CONFIANÇA: [0-100]%
-            JUSTIFICATIVA: [breve explicação]
-            """,
-            llm_config=llm_config,
+    def contar_post(self):
+        """Conta um post concluído para o cálculo da vazão"""
+        self.posts_processados += 1
+
+    def snapshot(self) -> Dict:
+        """Estado atual das métricas em formato serializável"""
+        duracao = time.monotonic() - self.inicio
+        return {
+            "duracao_s": round(duracao, 3),
+            "posts_processados": self.posts_processados,
+            "posts_por_segundo": round(self.posts_processados / duracao, 2)
+            if duracao > 0
+            else 0.0,
+            "etapas": {
+                etapa: histograma.resumo()
+                for etapa, histograma in self.etapas.items()
+            },
+            "filas": {
+                fila: {
+                    "atual": estatisticas["atual"],
+                    "maxima": estatisticas["maxima"],
+                    "media": round(estatisticas["soma"] / estatisticas["amostras"], 2),
+                }
+                for fila, estatisticas in self.filas.items()
+            },
+        }
+
+    def exportar_json(self, caminho: str):
+        """Grava o snapshot das métricas em JSON"""
+        with open(caminho, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=2, ensure_ascii=False)
+
+    def exportar_prometheus(self, caminho: str):
+        """Grava as métricas no formato texto do Prometheus"""
+        snapshot = self.snapshot()
+        linhas = [
+            "# HELP sentimentos_etapa_duracao_segundos Duração de cada etapa do pipeline",
+            "# TYPE sentimentos_etapa_duracao_segundos histogram",
+        ]
+        for etapa, histograma in self.etapas.items():
+            acumulado = 0
+            for limite, contagem in zip(histograma.LIMITES, histograma.contagens):
+                acumulado += contagem
+                le = "+Inf" if math.isinf(limite) else repr(limite)
+                linhas.append(
+                    f'sentimentos_etapa_duracao_segundos_bucket{{etapa="{etapa}",le="{le}"}} {acumulado}'
+                )
+            linhas.append(
+                f'sentimentos_etapa_duracao_segundos_sum{{etapa="{etapa}"}} {histograma.soma}'
+            )
+            linhas.append(
+                f'sentimentos_etapa_duracao_segundos_count{{etapa="{etapa}"}} {histograma.total}'
+            )
+
+        linhas += [
+            "# HELP sentimentos_posts_processados_total Posts analisados",
+            "# TYPE sentimentos_posts_processados_total counter",
+            f"sentimentos_posts_processados_total {snapshot['posts_processados']}",
+            "# HELP sentimentos_posts_por_segundo Vazão média da execução",
+            "# TYPE sentimentos_posts_por_segundo gauge",
+            f"sentimentos_posts_por_segundo {snapshot['posts_por_segundo']}",
+            "# HELP sentimentos_fila_profundidade Profundidade das filas do pipeline",
+            "# TYPE sentimentos_fila_profundidade gauge",
+        ]
+        for fila, estatisticas in snapshot["filas"].items():
+            for nome, valor in estatisticas.items():
+                linhas.append(
+                    f'sentimentos_fila_profundidade{{fila="{fila}",estatistica="{nome}"}} {valor}'
+                )
+
+        with open(caminho, "w", encoding="utf-8") as f:
+            f.write("\n".join(linhas) + "\n")
+
+
+class CacheSentimentos:
+    """Cache persistente (SQLite) de análises, endereçado pelo conteúdo do post
+
+    Um LRU em memória fica na frente do arquivo. Entradas expiram após
+    ttl_segundos e as menos acessadas são removidas além de max_entradas.
+    Consultas nunca abrem transações de escrita: os horários de acesso são
+    acumulados e gravados em lote, para que vários processos compartilhem
+    o mesmo arquivo.
+    """
+
+    # Horários de acesso acumulados antes de uma gravação em lote
+    ACESSOS_POR_GRAVACAO = 500
+
+    def __init__(
+        self,
+        caminho: str,
+        ttl_segundos: float = 7 * 24 * 3600,
+        max_entradas: int = 100_000,
+        max_memoria: int = 10_000,
+    ):
+        diretorio = os.path.dirname(caminho)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+
+        self.caminho = caminho
+        self.ttl_segundos = ttl_segundos
+        self.max_entradas = max_entradas
+        self.max_memoria = max_memoria
+
+        import sqlite3
+
+        self.conexao = sqlite3.connect(caminho)
+        self.conexao.execute("PRAGMA journal_mode=WAL")
+        self.conexao.execute("PRAGMA synchronous=NORMAL")
+        self.conexao.execute(
+            """CREATE TABLE IF NOT EXISTS analises (
+                chave TEXT PRIMARY KEY,
+                analise TEXT NOT NULL,
+                latencia REAL NOT NULL,
+                criado_em REAL NOT NULL,
+                acessado_em REAL NOT NULL
+            )"""
+        )
+        self.conexao.execute(
+            "CREATE INDEX IF NOT EXISTS idx_acessado_em ON analises (acessado_em)"
         )
+        self.conexao.commit()
 
-        # 3. AGENTE RELATOR - Gera relatório final com estatísticas
-        self.agente_relator = autogen.AssistantAgent(
-            name="AgenteRelator",
-            system_message="""Você é o Agente Relator.
-            Sua função é:
-            1. Receber todos os resultados das análises
-            2. Calcular estatísticas gerais
-            3. Gerar um relatório consolidado
-            4. Fornecer insights e recomendações
-            
-            Sempre inclua:
-            - Percentual de cada sentimento
-            - Total de posts analisados
-            - Tendência geral
-            - Recomendações baseadas nos dados
-            """,
-            llm_config=llm_config,
+        # chave -> (analise, latencia, criado_em), da menos para a mais recente
+        self._memoria = OrderedDict()
+        self._insercoes = 0
+        # chave -> horário do último acesso ainda não gravado no arquivo
+        self._acessos_pendentes: Dict[str, float] = {}
+
+        self.acertos = 0
+        self.falhas = 0
+        self.latencia_economizada = 0.0
+
+    @staticmethod
+    def gerar_chave(post: str, contexto: str) -> str:
+        """Hash do texto normalizado junto ao contexto da análise (prompt e modelo)"""
+        texto_normalizado = " ".join(post.lower().split())
+        conteudo = f"{contexto}\0{texto_normalizado}".encode("utf-8")
+        return hashlib.sha256(conteudo).hexdigest()
+
+    def obter(self, chave: str) -> Optional[Dict]:
+        """Retorna a análise armazenada, ou None se ausente ou expirada"""
+        agora = time.time()
+        entrada = self._memoria.get(chave)
+
+        if entrada is None:
+            linha = self.conexao.execute(
+                "SELECT analise, latencia, criado_em FROM analises WHERE chave = ?",
+                (chave,),
+            ).fetchone()
+            if linha is not None:
+                entrada = (json.loads(linha[0]), linha[1], linha[2])
+
+        if entrada is None or agora - entrada[2] > self.ttl_segundos:
+            # Entradas expiradas saem do arquivo em _aplicar_limites
+            self._memoria.pop(chave, None)
+            self.falhas += 1
+            return None
+
+        self._lembrar(chave, entrada)
+        self._acessos_pendentes[chave] = agora
+        if len(self._acessos_pendentes) >= self.ACESSOS_POR_GRAVACAO:
+            self._confirmar()
+        self.acertos += 1
+        self.latencia_economizada += entrada[1]
+
+        return dict(entrada[0])
+
+    def guardar(self, chave: str, analise: Dict, latencia: float):
+        """Armazena uma análise junto da latência gasta para produzi-la"""
+        agora = time.time()
+        self._lembrar(chave, (analise, latencia, agora))
+        self.conexao.execute(
+            "INSERT OR REPLACE INTO analises VALUES (?, ?, ?, ?, ?)",
+            (chave, json.dumps(analise, ensure_ascii=False), latencia, agora, agora),
+        )
+
+        self._insercoes += 1
+        if self._insercoes % 1000 == 0:
+            self._aplicar_limites()
+        self._confirmar()
+
+    def _confirmar(self):
+        """Grava os horários de acesso pendentes e encerra a transação"""
+        if self._acessos_pendentes:
+            self.conexao.executemany(
+                "UPDATE analises SET acessado_em = ? WHERE chave = ?",
+                [(agora, chave) for chave, agora in self._acessos_pendentes.items()],
+            )
+            self._acessos_pendentes.clear()
+        self.conexao.commit()
+
+    def _lembrar(self, chave: str, entrada: Tuple):
+        """Coloca a entrada no topo do LRU em memória"""
+        self._memoria[chave] = entrada
+        self._memoria.move_to_end(chave)
+        while len(self._memoria) > self.max_memoria:
+            self._memoria.popitem(last=False)
+
+    def _aplicar_limites(self):
+        """Remove entradas expiradas e as menos acessadas além do limite"""
+        self._confirmar()
+        self.conexao.execute(
+            "DELETE FROM analises WHERE criado_em < ?",
+            (time.time() - self.ttl_segundos,),
         )
+        (total,) = self.conexao.execute("SELECT COUNT(*) FROM analises").fetchone()
+        excedente = total - self.max_entradas
+        if excedente > 0:
+            self.conexao.execute(
+                """DELETE FROM analises WHERE chave IN (
+                    SELECT chave FROM analises ORDER BY acessado_em LIMIT ?
+                )""",
+                (excedente,),
+            )
+        self.conexao.commit()
+
+    def estatisticas(self) -> Dict:
+        """Contadores de uso do cache para o relatório"""
+        consultas = self.acertos + self.falhas
+        return {
+            "acertos": self.acertos,
+            "falhas": self.falhas,
+            "taxa_acerto": round((self.acertos / consultas) * 100, 2)
+            if consultas
+            else 0.0,
+            "latencia_economizada_s": round(self.latencia_economizada, 3),
+        }
+
+    def fechar(self):
+        """Aplica os limites de tamanho e fecha o arquivo"""
+        self._aplicar_limites()
+        self.conexao.close()
+
+
+class EscritorResultados:
+    """Gravação incremental dos resultados em arquivos JSON Lines rotacionados
+
+    Os resultados ficam em um buffer e são gravados em lotes. Após cada
+    gravação o estado (parte atual, posição no arquivo e agregados) é salvo em
+    estado.json, o que permite retomar uma execução interrompida. O estado
+    também guarda a descrição da entrada, e a retomada só é aceita com a
+    mesma entrada, já que ela consiste em pular os posts já gravados.
+    """
+
+    # No formato "jsonl.gz" cada lote é um membro gzip independente, então o
+    # arquivo continua válido (e truncável) entre uma gravação e outra
+    FORMATOS = {"jsonl": ".jsonl", "jsonl.gz": ".jsonl.gz"}
+
+    def __init__(
+        self,
+        diretorio: str,
+        formato: str = "jsonl",
+        tamanho_buffer: int = 500,
+        tamanho_max_mb: float = 100,
+        intervalo_rotacao: float = 0,
+        entrada: Optional[Dict] = None,
+        retomar: bool = False,
+    ):
+        if formato not in self.FORMATOS:
+            raise ValueError(f"Formato de saída desconhecido: {formato}")
+
+        caminho_estado = os.path.join(diretorio, "estado.json")
+        if retomar and not os.path.exists(caminho_estado):
+            raise ValueError(f"{diretorio} não contém uma execução para retomar")
+        if not retomar and os.path.exists(caminho_estado):
+            raise ValueError(
+                f"{diretorio} já contém uma execução; use --retomar para continuá-la"
+            )
+
+        os.makedirs(diretorio, exist_ok=True)
+        self.diretorio = diretorio
+        self.tamanho_buffer = tamanho_buffer
+        self.tamanho_max = int(tamanho_max_mb * 1024 * 1024)
+        self.intervalo_rotacao = intervalo_rotacao
+        self.caminho_estado = caminho_estado
+
+        if retomar:
+            with open(self.caminho_estado, "r", encoding="utf-8") as f:
+                self.estado = json.load(f)
+            if self.estado.get("entrada") != entrada:
+                raise ValueError(
+                    f"A execução em {diretorio} usou outra entrada: "
+                    f"{self.estado.get('entrada')}"
+                )
+            if self.estado["formato"] != formato:
+                print(
+                    f"Retomando no formato da execução original: "
+                    f"{self.estado['formato']}"
+                )
+        else:
+            self.estado = {
+                "entrada": entrada,
+                "formato": formato,
+                "parte": 0,
+                "posicao": 0,
+                "posts_processados": 0,
+                "contagem": {"POSITIVO": 0, "NEGATIVO": 0, "NEUTRO": 0},
+            }
+            # Gravado já na criação: uma queda antes da primeira gravação
+            # também pode ser retomada, e o diretório fica ligado à entrada
+            self._salvar_estado()
+
+        self._buffer = []
+        # Preenchido pelo sistema para medir cada gravação em lote
+        self.metricas: Optional[MetricasPipeline] = None
+        self._abrir_parte()
+
+    @property
+    def posts_processados(self) -> int:
+        """Quantidade de posts já gravados de forma durável"""
+        return self.estado["posts_processados"]
+
+    @property
+    def contagem(self) -> Dict:
+        """Contagem de sentimentos dos posts já gravados"""
+        return dict(self.estado["contagem"])
 
-        # Agente Usuário para coordenação
-        self.user_proxy = autogen.UserProxyAgent(
-            name="Coordenador",
-            human_input_mode="NEVER",
-            max_consecutive_auto_reply=10,
-            code_execution_config={"use_docker": False},
+    @property
+    def pendentes(self) -> int:
+        """Quantidade de resultados no buffer aguardando gravação"""
+        return len(self._buffer)
+
+    def _abrir_parte(self):
+        """Abre a parte atual, descartando bytes gravados após o último estado"""
+        extensao = self.FORMATOS[self.estado["formato"]]
+        self.caminho_atual = os.path.join(
+            self.diretorio, f"resultados_{self.estado['parte']:05d}{extensao}"
         )
+        self._arquivo = open(self.caminho_atual, "ab")
+        self._arquivo.truncate(self.estado["posicao"])
+        self._aberta_em = time.monotonic()
+
+    def escrever(self, resultado: Dict):
+        """Adiciona um resultado ao buffer, gravando-o quando estiver cheio"""
+        self._buffer.append(resultado)
+        if len(self._buffer) >= self.tamanho_buffer:
+            self.descarregar()
+
+    def descarregar(self):
+        """Grava o buffer no disco e atualiza o estado para retomada"""
+        if not self._buffer:
+            return
+
+        if self.metricas is None:
+            self._gravar_buffer()
+        else:
+            with self.metricas.medir("gravacao"):
+                self._gravar_buffer()
+
+    def _gravar_buffer(self):
+        """Grava o buffer, sincroniza o arquivo e rotaciona a parte se preciso"""
+        dados = "".join(
+            json.dumps(resultado, ensure_ascii=False) + "\n"
+            for resultado in self._buffer
+        ).encode("utf-8")
+        if self.estado["formato"] == "jsonl.gz":
+            import gzip
+
+            dados = gzip.compress(dados)
+
+        self._arquivo.write(dados)
+        self._arquivo.flush()
+        os.fsync(self._arquivo.fileno())
+
+        for resultado in self._buffer:
+            self.estado["contagem"][resultado["sentimento"]] += 1
+        self.estado["posts_processados"] += len(self._buffer)
+        self.estado["posicao"] = self._arquivo.tell()
+        self._buffer = []
+
+        if self.estado["posicao"] >= self.tamanho_max or (
+            self.intervalo_rotacao
+            and time.monotonic() - self._aberta_em >= self.intervalo_rotacao
+        ):
+            self._arquivo.close()
+            self.estado["parte"] += 1
+            self.estado["posicao"] = 0
+            self._salvar_estado()
+            self._abrir_parte()
+        else:
+            self._salvar_estado()
+
+    def _salvar_estado(self):
+        """Substitui estado.json de forma atômica"""
+        temporario = self.caminho_estado + ".tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump(self.estado, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporario, self.caminho_estado)
+
+    def escrever_relatorio(self, relatorio: Dict) -> str:
+        """Grava o relatório final em um arquivo separado dos resultados"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        caminho = os.path.join(self.diretorio, f"relatorio_{timestamp}.json")
+        with open(caminho, "w", encoding="utf-8") as f:
+            json.dump(relatorio, f, indent=2, ensure_ascii=False)
+        return caminho
+
+    def fechar(self):
+        """Grava o que restar no buffer e fecha a parte atual"""
+        self.descarregar()
+        self._arquivo.close()
+
+
+class SistemaAnaliseMultiAgente:
+    """Sistema principal que coordena os agentes"""
+
+    def __init__(
+        self,
+        posts: Optional[Iterable[str]] = None,
+        usar_llm: bool = False,
+        offline: bool = False,
+        manter_resultados: bool = True,
+        relatorio_a_cada: int = 0,
+        relatorio_intervalo: float = 0,
+        cache: Optional[CacheSentimentos] = None,
+        escritor: Optional[EscritorResultados] = None,
+        silencioso: bool = False,
+    ):
+        """Inicializa o sistema; os agentes são criados apenas no primeiro uso
+
+        posts pode ser qualquer iterável (ex.: o gerador de ler_posts). Com
+        manter_resultados=False os resultados individuais não ficam em memória:
+        apenas os agregados usados no relatório são mantidos. Com um escritor,
+        cada resultado é gravado assim que analisado e uma execução
+        interrompida continua a partir do último post gravado. No modo offline
+        apenas a análise por palavras-chave é usada e o AutoGen/OpenAI nunca
+        são importados. Com silencioso=True as mensagens por post não são
+        exibidas.
+        """
+        if offline and usar_llm:
+            raise ValueError("O modo offline não pode ser combinado com usar_llm")
+        if cache is not None and not usar_llm:
+            raise ValueError("O cache só armazena análises do modelo (usar_llm)")
+
+        self.posts = POSTS_SIMULADOS if posts is None else posts
+        self.resultados = []
+        self.manter_resultados = manter_resultados
+        self.usar_llm = usar_llm
+        self.offline = offline
+        self.silencioso = silencioso
+        self.metricas = MetricasPipeline()
+
+        # Agregados incrementais usados pelo relatório
+        self.contagem = {"POSITIVO": 0, "NEGATIVO": 0, "NEUTRO": 0}
+        self.total_processado = 0
+
+        self.escritor = escritor
+        if escritor is not None:
+            escritor.metricas = self.metricas
+        if escritor is not None and escritor.posts_processados:
+            self.contagem = escritor.contagem
+            self.total_processado = escritor.posts_processados
+        # Posts já gravados por uma execução anterior são pulados
+        self.inicio = self.total_processado
+
+        # Relatórios parciais a cada N posts e/ou T segundos (0 desativa)
+        self.relatorio_a_cada = relatorio_a_cada
+        self.relatorio_intervalo = relatorio_intervalo
+        self._ultimo_relatorio_parcial = time.monotonic()
+
+        # O cache guarda apenas respostas do modelo. O contexto entra na
+        # chave: mudar o prompt ou o modelo invalida as análises anteriores
+        self.cache = cache
+        contexto = {
+            "prompt": PROMPT_ANALISADOR,
+            "modelo": config_list[0]["model"],
+            "base_url": config_list[0].get("base_url"),
+            "temperature": llm_config["temperature"],
+        }
+        self._contexto_cache = json.dumps(contexto, sort_keys=True, ensure_ascii=False)
+
+    def _obter_agente(self, nome: str):
+        """Retorna um agente do pool compartilhado, criando-o no primeiro uso"""
+        if self.offline:
+            raise RuntimeError(
+                f"{nome} indisponível: o sistema está no modo offline (palavras-chave)"
+            )
+        return obter_agentes()[nome]
+
+    @property
+    def agente_coletor(self):
+        """Agente Coletor, criado no primeiro acesso"""
+        return self._obter_agente("AgenteColetor")
+
+    @property
+    def agente_analisador(self):
+        """Agente Analisador, criado no primeiro acesso"""
+        return self._obter_agente("AgenteAnalisador")
+
+    @property
+    def agente_relator(self):
+        """Agente Relator, criado no primeiro acesso"""
+        return self._obter_agente("AgenteRelator")
+
+    @property
+    def user_proxy(self):
+        """Agente Usuário (Coordenador), criado no primeiro acesso"""
+        return self._obter_agente("Coordenador")
+
+    def criar_agentes(self):
+        """Carrega antecipadamente os agentes (normalmente criados no primeiro uso)"""
+        self._obter_agente("AgenteColetor")
 
     def processar_post(self, post: str, indice: int) -> Dict:
         """Processa um post individual através dos agentes"""
-        print(f"\n{'='*70}")
-        print(f"PROCESSANDO POST #{indice + 1}")
-        print(f"{'='*70}")
-        print(f"Post: {post}\n")
+        self._exibir(f"\n{'='*70}")
+        self._exibir(f"PROCESSANDO POST #{indice + 1}")
+        self._exibir(f"{'='*70}")
+        self._exibir(f"Post: {post}\n")
 
         # Etapa 1: Coletor recebe o post
         mensagem_coleta = f"""
@@ -117,7 +901,7 @@ class SistemaAnaliseMultiAgente:
         Por favor, confirme o recebimento e prepare para análise.
         """
 
-        print("→ AGENTE COLETOR: Recebendo post...")
+        self._exibir("→ AGENTE COLETOR: Recebendo post...")
 
         # Etapa 2: Analisador processa o sentimento
         mensagem_analise = f"""
@@ -127,20 +911,41 @@ class SistemaAnaliseMultiAgente:
         Forneça sua análise no formato especificado.
         """
 
-        print("→ AGENTE ANALISADOR: Analisando sentimento...")
+        self._exibir("→ AGENTE ANALISADOR: Analisando sentimento...")
 
         # Simulação simplificada da análise (em produção, usaria chat real)
+        with self.metricas.medir("analise"):
+            sentimento = self._analisar_sentimento_basico(post)
+
         resultado = {
             "post": post,
             "indice": indice + 1,
-            "sentimento": self._analisar_sentimento_basico(post),
+            "sentimento": sentimento,
             "timestamp": datetime.now().isoformat(),
         }
 
-        print(f"Sentimento detectado: {resultado['sentimento']}")
+        self._exibir(f"Sentimento detectado: {resultado['sentimento']}")
 
         return resultado
 
+    def _exibir(self, mensagem: str):
+        """Exibe mensagens por post, exceto no modo silencioso"""
+        if not self.silencioso:
+            print(mensagem)
+
+    def _coletar(self) -> Iterator[Tuple[int, str]]:
+        """Percorre a entrada a partir do ponto de retomada, medindo a coleta"""
+        posts = itertools.islice(self.posts, self.inicio, None)
+        indice = self.inicio
+        while True:
+            inicio = time.perf_counter()
+            post = next(posts, None)
+            if post is None:
+                return
+            self.metricas.registrar("coleta", time.perf_counter() - inicio)
+            yield indice, post
+            indice += 1
+
     def _analisar_sentimento_basico(self, post: str) -> str:
         """Análise básica de sentimento (fallback sem API)"""
         post_lower = post.lower()
@@ -179,18 +984,286 @@ class SistemaAnaliseMultiAgente:
         else:
             return "NEUTRO"
 
-    def gerar_relatorio(self, resultados: List[Dict]) -> Dict:
-        """Gera relatório final com estatísticas"""
+    def _consultar_cache(self, post: str) -> Optional[Dict]:
+        """Busca a análise de um post no cache, se houver um configurado"""
+        if self.cache is None:
+            return None
+        return self.cache.obter(CacheSentimentos.gerar_chave(post, self._contexto_cache))
+
+    def _guardar_cache(self, post: str, analise: Dict, latencia: float):
+        """Armazena a análise de um post no cache, se houver um configurado"""
+        if self.cache is not None:
+            chave = CacheSentimentos.gerar_chave(post, self._contexto_cache)
+            self.cache.guardar(chave, analise, latencia)
+
+    def _resultado_basico(self, post: str, indice: int, justificativa: str) -> Dict:
+        """Monta o resultado de um post usando a análise por palavras-chave"""
+        return {
+            "post": post,
+            "indice": indice + 1,
+            "sentimento": self._analisar_sentimento_basico(post),
+            "confianca": None,
+            "justificativa": justificativa,
+            "timestamp": datetime.now().isoformat(),
+        }
+
+    def _montar_prompt_lote(self, lote: List[Tuple[int, str]]) -> str:
+        """Monta um único prompt do analisador contendo vários posts"""
+        linhas = [
+            "Analise separadamente cada um dos posts abaixo.",
+            "Para cada post, responda com uma linha 'POST <número>:' seguida do",
+            "bloco SENTIMENTO/CONFIANÇA/JUSTIFICATIVA no formato especificado.",
+            "",
+        ]
+        for indice, post in lote:
+            linhas.append(f'POST {indice + 1}: "{post}"')
+        return "\n".join(linhas)
+
+    def _interpretar_bloco(self, bloco: str) -> Optional[Dict]:
+        """Extrai SENTIMENTO, CONFIANÇA e JUSTIFICATIVA de um bloco de resposta"""
+        sentimento = re.search(
+            r"SENTIMENTO:\s*\[?\s*(POSITIVO|NEGATIVO|NEUTRO)", bloco, re.IGNORECASE
+        )
+        if sentimento is None:
+            return None
+
+        confianca = re.search(r"CONFIAN[ÇC]A:\s*\[?\s*(\d{1,3})", bloco, re.IGNORECASE)
+        justificativa = re.search(r"JUSTIFICATIVA:\s*\[?(.+)", bloco, re.IGNORECASE)
+
+        return {
+            "sentimento": sentimento.group(1).upper(),
+            "confianca": min(int(confianca.group(1)), 100) if confianca else None,
+            "justificativa": (
+                justificativa.group(1).strip().rstrip("]").strip()
+                if justificativa
+                else ""
+            ),
+        }
+
+    def _interpretar_resposta_lote(
+        self, resposta: str, lote: List[Tuple[int, str]]
+    ) -> List[Dict]:
+        """Separa a resposta do modelo em um resultado por post do lote"""
+        partes = re.split(
+            r"^\W*POST\s*#?\s*(\d+)\W*?:?",
+            resposta,
+            flags=re.IGNORECASE | re.MULTILINE,
+        )
+        blocos = {int(numero): bloco for numero, bloco in zip(partes[1::2], partes[2::2])}
+
+        # Com um único post o modelo pode omitir o cabeçalho "POST <número>:"
+        if not blocos and len(lote) == 1:
+            blocos[lote[0][0] + 1] = resposta
+
+        resultados = []
+        for indice, post in lote:
+            analise = self._interpretar_bloco(blocos.get(indice + 1, ""))
+            if analise is None:
+                resultados.append(
+                    {
+                        **self._resultado_basico(
+                            post, indice, "Resposta do modelo incompleta (fallback)"
+                        ),
+                        "_armazenavel": False,
+                    }
+                )
+                continue
+
+            resultados.append(
+                {
+                    "post": post,
+                    "indice": indice + 1,
+                    **analise,
+                    "timestamp": datetime.now().isoformat(),
+                }
+            )
+
+        return resultados
+
+    async def _consultar_modelo(self, prompt: str) -> str:
+        """Envia um prompt ao modelo do analisador e retorna o texto da resposta"""
+        resposta = await obter_cliente_llm().chat.completions.create(
+            model=config_list[0]["model"],
+            messages=[
+                {"role": "system", "content": PROMPT_ANALISADOR},
+                {"role": "user", "content": prompt},
+            ],
+            temperature=llm_config["temperature"],
+        )
+
+        return resposta.choices[0].message.content or ""
+
+    async def _analisar_lote(
+        self, lote: List[Tuple[int, str]], semaforo: "asyncio.Semaphore"
+    ) -> List[Dict]:
+        """Analisa um lote de posts, consultando o cache antes do modelo"""
+        resultados = []
+        pendentes = []
+        for indice, post in lote:
+            analise = self._consultar_cache(post)
+            if analise is None:
+                pendentes.append((indice, post))
+                continue
+            resultados.append(
+                {
+                    "post": post,
+                    "indice": indice + 1,
+                    **analise,
+                    "timestamp": datetime.now().isoformat(),
+                }
+            )
+
+        if not pendentes:
+            return resultados
+
+        analisados, duracao = await self._analisar_pendentes(pendentes, semaforo)
+        latencia = duracao / len(pendentes)
+
+        for resultado in analisados:
+            # Resultados de fallback por falha do modelo não são armazenados
+            if resultado.pop("_armazenavel", True):
+                analise = {
+                    campo: resultado[campo]
+                    for campo in ("sentimento", "confianca", "justificativa")
+                }
+                self._guardar_cache(resultado["post"], analise, latencia)
+            resultados.append(resultado)
+
+        return resultados
+
+    async def _analisar_pendentes(
+        self, lote: List[Tuple[int, str]], semaforo: "asyncio.Semaphore"
+    ) -> Tuple[List[Dict], float]:
+        """Analisa um lote de posts com timeout, novas tentativas e backoff
+
+        Retorna também a duração da chamada bem-sucedida ao modelo, sem a
+        espera pelo semáforo, as tentativas que falharam e o backoff entre
+        elas; é essa a latência que um acerto no cache economiza.
+        """
+        import asyncio
+
+        if not self.usar_llm:
+            inicio = time.perf_counter()
+            resultados = [
+                self._resultado_basico(post, indice, "Análise por palavras-chave")
+                for indice, post in lote
+            ]
+            duracao = time.perf_counter() - inicio
+            self.metricas.registrar("analise", duracao)
+            return resultados, duracao
+
+        prompt = self._montar_prompt_lote(lote)
+        espera = pipeline_config["backoff_inicial"]
+        tentativas = pipeline_config["tentativas"]
+
+        for tentativa in range(1, tentativas + 1):
+            try:
+                inicio_espera = time.perf_counter()
+                async with semaforo:
+                    # A espera pela vaga fica fora da latência da análise
+                    self.metricas.registrar(
+                        "espera_modelo", time.perf_counter() - inicio_espera
+                    )
+                    inicio = time.perf_counter()
+                    try:
+                        resposta = await asyncio.wait_for(
+                            self._consultar_modelo(prompt),
+                            timeout=pipeline_config["timeout"],
+                        )
+                    finally:
+                        duracao = time.perf_counter() - inicio
+                        self.metricas.registrar("analise", duracao)
+            except Exception as erro:
+                print(
+                    f"→ AGENTE ANALISADOR: falha no lote "
+                    f"(tentativa {tentativa}/{tentativas}): {erro!r}"
+                )
+                # Erros de autenticação, requisição inválida etc. não se
+                # resolvem com uma nova tentativa
+                if not _erro_transitorio(erro):
+                    break
+                if tentativa < tentativas:
+                    await asyncio.sleep(espera)
+                    espera *= 2
+            else:
+                return self._interpretar_resposta_lote(resposta, lote), duracao
+
+        fallback = [
+            {
+                **self._resultado_basico(
+                    post, indice, "Modelo indisponível (fallback)"
+                ),
+                "_armazenavel": False,
+            }
+            for indice, post in lote
+        ]
+        return fallback, 0.0
+
+    def _registrar_resultado(self, resultado: Dict):
+        """Atualiza os agregados com um novo resultado e emite relatórios parciais"""
+        self.contagem[resultado["sentimento"]] += 1
+        self.total_processado += 1
+
+        if self.manter_resultados:
+            self.resultados.append(resultado)
+        if self.escritor is not None:
+            self.escritor.escrever(resultado)
+            self.metricas.registrar_fila("buffer_escrita", self.escritor.pendentes)
+        self.metricas.contar_post()
+
+        agora = time.monotonic()
+        por_quantidade = (
+            self.relatorio_a_cada
+            and self.total_processado % self.relatorio_a_cada == 0
+        )
+        por_tempo = (
+            self.relatorio_intervalo
+            and agora - self._ultimo_relatorio_parcial >= self.relatorio_intervalo
+        )
+        if por_quantidade or por_tempo:
+            self._ultimo_relatorio_parcial = agora
+            self.exibir_relatorio_parcial()
+
+    def exibir_relatorio_parcial(self):
+        """Exibe um resumo dos agregados acumulados até o momento"""
+        total = self.total_processado
+        print(f"\n{'-'*70}")
+        print(f"RELATÓRIO PARCIAL - {total} posts analisados")
+        print(
+            f"   Positivos: {self.contagem['POSITIVO']} "
+            f"({self._percentual(self.contagem['POSITIVO'], total)}%) | "
+            f"Negativos: {self.contagem['NEGATIVO']} "
+            f"({self._percentual(self.contagem['NEGATIVO'], total)}%) | "
+            f"Neutros: {self.contagem['NEUTRO']} "
+            f"({self._percentual(self.contagem['NEUTRO'], total)}%)"
+        )
+        print(f"   Tendência: {self._determinar_tendencia(self.contagem)}")
+        print(f"{'-'*70}")
+
+    @staticmethod
+    def _percentual(quantidade: int, total: int) -> float:
+        """Percentual arredondado, tratando o caso sem posts"""
+        return round((quantidade / total) * 100, 2) if total else 0.0
+
+    def gerar_relatorio(self, resultados: Optional[List[Dict]] = None) -> Dict:
+        """Gera relatório final com estatísticas
+
+        Sem a lista de resultados, usa os agregados incrementais do sistema.
+        """
         print(f"\n{'='*70}")
         print("GERANDO RELATÓRIO FINAL")
         print(f"{'='*70}\n")
 
-        total = len(resultados)
-        contagem = {"POSITIVO": 0, "NEGATIVO": 0, "NEUTRO": 0}
+        if resultados is None:
+            total = self.total_processado
+            contagem = dict(self.contagem)
+        else:
+            total = len(resultados)
+            contagem = {"POSITIVO": 0, "NEGATIVO": 0, "NEUTRO": 0}
 
-        for resultado in resultados:
-            sentimento = resultado["sentimento"]
-            contagem[sentimento] += 1
+            for resultado in resultados:
+                sentimento = resultado["sentimento"]
+                contagem[sentimento] += 1
 
         relatorio = {
             "total_posts": total,
@@ -198,25 +1271,31 @@ class SistemaAnaliseMultiAgente:
             "estatisticas": {
                 "positivos": {
                     "quantidade": contagem["POSITIVO"],
-                    "percentual": round((contagem["POSITIVO"] / total) * 100, 2),
+                    "percentual": self._percentual(contagem["POSITIVO"], total),
                 },
                 "negativos": {
                     "quantidade": contagem["NEGATIVO"],
-                    "percentual": round((contagem["NEGATIVO"] / total) * 100, 2),
+                    "percentual": self._percentual(contagem["NEGATIVO"], total),
                 },
                 "neutros": {
                     "quantidade": contagem["NEUTRO"],
-                    "percentual": round((contagem["NEUTRO"] / total) * 100, 2),
+                    "percentual": self._percentual(contagem["NEUTRO"], total),
                 },
             },
             "tendencia_geral": self._determinar_tendencia(contagem),
             "recomendacoes": self._gerar_recomendacoes(contagem, total),
         }
 
+        if self.cache is not None:
+            relatorio["cache"] = self.cache.estatisticas()
+
         return relatorio
 
     def _determinar_tendencia(self, contagem: Dict) -> str:
         """Determina a tendência geral dos sentimentos"""
+        if sum(contagem.values()) == 0:
+            return "SEM DADOS - Nenhum post analisado"
+
         max_sentimento = max(contagem, key=contagem.get)
 
         if max_sentimento == "POSITIVO":
@@ -232,6 +1311,9 @@ class SistemaAnaliseMultiAgente:
         """Gera recomendações baseadas nos resultados"""
         recomendacoes = []
 
+        if total == 0:
+            return ["Nenhum post analisado."]
+
         perc_positivo = (contagem["POSITIVO"] / total) * 100
         perc_negativo = (contagem["NEGATIVO"] / total) * 100
 
@@ -261,28 +1343,146 @@ class SistemaAnaliseMultiAgente:
 
     def executar(self):
         """Executa o sistema completo"""
+        # Apenas o pipeline assíncrono consulta o modelo
+        if self.usar_llm:
+            import asyncio
+
+            return asyncio.run(self.executar_async())
+
         print("\n" + "=" * 70)
         print(" SISTEMA DE ANÁLISE DE SENTIMENTOS - MULTI-AGENTE ".center(70, "="))
         print("=" * 70)
-        print(f"\nTotal de posts para análise: {len(self.posts)}")
+        print(f"\nTotal de posts para análise: {self._descrever_total()}")
         print(f"Agentes ativos: Coletor, Analisador, Relator")
 
+        if self.inicio:
+            print(f"Retomando após {self.inicio} posts já gravados")
+
         # Processar cada post
-        for i, post in enumerate(self.posts):
+        for i, post in self._coletar():
             resultado = self.processar_post(post, i)
-            self.resultados.append(resultado)
+            self._registrar_resultado(resultado)
 
         # Gerar relatório final
-        relatorio = self.gerar_relatorio(self.resultados)
+        with self.metricas.medir("relatorio"):
+            relatorio = self.gerar_relatorio()
 
         # Exibir relatório
         self.exibir_relatorio(relatorio)
 
         # Salvar resultados
-        self.salvar_resultados(relatorio)
+        with self.metricas.medir("salvamento"):
+            self.salvar_resultados(relatorio)
+
+        self.exibir_metricas()
 
         return relatorio
 
+    async def executar_async(self) -> Dict:
+        """Executa o pipeline coletor → analisador → relator de forma assíncrona"""
+        import asyncio
+
+        print("\n" + "=" * 70)
+        print(" SISTEMA DE ANÁLISE DE SENTIMENTOS - MULTI-AGENTE ".center(70, "="))
+        print("=" * 70)
+        print(f"\nTotal de posts para análise: {self._descrever_total()}")
+        print(
+            f"Modo assíncrono: até {pipeline_config['max_concorrencia']} chamadas "
+            f"simultâneas, {pipeline_config['posts_por_lote']} posts por prompt"
+        )
+        if self.inicio:
+            print(f"Retomando após {self.inicio} posts já gravados")
+
+        max_concorrencia = pipeline_config["max_concorrencia"]
+        posts_por_lote = pipeline_config["posts_por_lote"]
+        semaforo = asyncio.Semaphore(max_concorrencia)
+        fila_lotes = asyncio.Queue(maxsize=max_concorrencia * 2)
+        fila_resultados = asyncio.Queue(maxsize=max_concorrencia * posts_por_lote * 2)
+        # Limita quantos posts podem estar lidos e ainda não gravados. Um lote
+        # lento segura a gravação em ordem dos seguintes; sem o limite, os
+        # resultados posteriores se acumulariam sem fim na reordenação
+        em_andamento = asyncio.Semaphore(max_concorrencia * posts_por_lote * 4)
+
+        async def coletor():
+            """Agrupa os posts em lotes e os envia para os analisadores"""
+            lote = []
+            # A leitura da entrada bloqueia (arquivo, stdin em fluxo); feita
+            # em outra thread, ela não trava as chamadas ao modelo em andamento
+            posts = self._coletar()
+            while True:
+                item = await asyncio.to_thread(next, posts, None)
+                if item is None:
+                    break
+                indice, post = item
+                await em_andamento.acquire()
+                lote.append((indice, post))
+                if len(lote) == posts_por_lote:
+                    await fila_lotes.put(lote)
+                    self.metricas.registrar_fila("lotes", fila_lotes.qsize())
+                    lote = []
+            if lote:
+                await fila_lotes.put(lote)
+            for _ in range(max_concorrencia):
+                await fila_lotes.put(None)
+
+        async def analisador():
+            """Consome lotes da fila e publica um resultado por post"""
+            while True:
+                lote = await fila_lotes.get()
+                if lote is None:
+                    await fila_resultados.put(None)
+                    return
+                resultados = await self._analisar_lote(lote, semaforo)
+                for resultado in resultados:
+                    await fila_resultados.put(resultado)
+                self.metricas.registrar_fila("resultados", fila_resultados.qsize())
+
+        async def relator():
+            """Registra os resultados na ordem original dos posts"""
+            # Os lotes terminam fora de ordem; a gravação em ordem garante que
+            # a retomada possa simplesmente pular os posts já gravados
+            fora_de_ordem = {}
+            proximo = self.inicio + 1
+            finalizados = 0
+            while finalizados < max_concorrencia:
+                resultado = await fila_resultados.get()
+                if resultado is None:
+                    finalizados += 1
+                    continue
+                self._exibir(f"→ Post #{resultado['indice']}: {resultado['sentimento']}")
+                fora_de_ordem[resultado["indice"]] = resultado
+                while proximo in fora_de_ordem:
+                    self._registrar_resultado(fora_de_ordem.pop(proximo))
+                    em_andamento.release()
+                    proximo += 1
+                self.metricas.registrar_fila("reordenacao", len(fora_de_ordem))
+
+        try:
+            await asyncio.gather(
+                coletor(),
+                *(analisador() for _ in range(max_concorrencia)),
+                relator(),
+            )
+        finally:
+            await fechar_clientes_llm()
+
+        with self.metricas.medir("relatorio"):
+            relatorio = self.gerar_relatorio()
+        self.exibir_relatorio(relatorio)
+        with self.metricas.medir("salvamento"):
+            self.salvar_resultados(relatorio)
+
+        self.exibir_metricas()
+
+        return relatorio
+
+    def _descrever_total(self) -> str:
+        """Total de posts da entrada, quando conhecido de antemão"""
+        try:
+            return str(len(self.posts))
+        except TypeError:
+            return "desconhecido (leitura em fluxo)"
+
     def exibir_relatorio(self, relatorio: Dict):
         """Exibe o relatório de forma formatada"""
         print("\n" + "=" * 70)
@@ -312,17 +1512,54 @@ class SistemaAnaliseMultiAgente:
         for rec in relatorio["recomendacoes"]:
             print(f"   {rec}")
 
+        if "cache" in relatorio:
+            cache = relatorio["cache"]
+            print(f"\nCACHE DE ANÁLISES")
+            print(
+                f"   Acertos: {cache['acertos']} | Falhas: {cache['falhas']} "
+                f"({cache['taxa_acerto']}% de acerto)"
+            )
+            print(f"   Latência economizada: {cache['latencia_economizada_s']}s")
+
         print("\n" + "=" * 70 + "\n")
 
+    def exibir_metricas(self):
+        """Exibe o resumo de desempenho de cada etapa do pipeline"""
+        snapshot = self.metricas.snapshot()
+        print(f"\nDESEMPENHO ({snapshot['posts_por_segundo']} posts/s)")
+        for etapa, resumo in snapshot["etapas"].items():
+            print(
+                f"   {etapa}: {resumo['chamadas']} chamadas | "
+                f"total {resumo['total_s']:.3f}s | "
+                f"p50 {resumo['p50_s'] * 1000:.3f}ms | "
+                f"p95 {resumo['p95_s'] * 1000:.3f}ms | "
+                f"p99 {resumo['p99_s'] * 1000:.3f}ms"
+            )
+        for fila, estatisticas in snapshot["filas"].items():
+            print(
+                f"   fila {fila}: máxima {estatisticas['maxima']} | "
+                f"média {estatisticas['media']}"
+            )
+
     def salvar_resultados(self, relatorio: Dict):
         """Salva os resultados em arquivo JSON"""
+        if self.escritor is not None:
+            # Os resultados já foram gravados durante a execução
+            self.escritor.fechar()
+            filename = self.escritor.escrever_relatorio(relatorio)
+            print(f"Resultados salvos em: {self.escritor.diretorio}")
+            print(f"Relatório salvo em: {filename}")
+            return
+
         output_dir = "../data"
         os.makedirs(output_dir, exist_ok=True)
 
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"{output_dir}/analise_sentimentos_{timestamp}.json"
 
-        dados_completos = {"relatorio": relatorio, "posts_analisados": self.resultados}
+        dados_completos = {"relatorio": relatorio}
+        if self.manter_resultados:
+            dados_completos["posts_analisados"] = self.resultados
 
         with open(filename, "w", encoding="utf-8") as f:
             json.dump(dados_completos, f, indent=2, ensure_ascii=False)
@@ -332,11 +1569,239 @@ class SistemaAnaliseMultiAgente:
 
 def main():
     """Função principal"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Sistema Multi-Agente de Análise de Sentimentos"
+    )
+    parser.add_argument(
+        "--assincrono",
+        action="store_true",
+        help="executa o pipeline assíncrono com concorrência limitada",
+    )
+    modo = parser.add_mutually_exclusive_group()
+    modo.add_argument(
+        "--llm",
+        action="store_true",
+        help="usa o modelo configurado em llm_config no lugar das palavras-chave "
+        "(sempre pelo pipeline assíncrono)",
+    )
+    modo.add_argument(
+        "--offline",
+        action="store_true",
+        help="usa apenas as palavras-chave, sem carregar AutoGen/OpenAI",
+    )
+    parser.add_argument(
+        "--entrada",
+        nargs="+",
+        metavar="ARQUIVO",
+        help="lê os posts em fluxo de arquivos JSONL/CSV/texto ('-' para stdin)",
+    )
+    parser.add_argument(
+        "--formato",
+        choices=["auto", "jsonl", "csv", "texto"],
+        default="auto",
+        help="formato dos arquivos de entrada (padrão: pela extensão)",
+    )
+    parser.add_argument(
+        "--coluna",
+        help="coluna do CSV (ou campo do JSON) com o texto dos posts",
+    )
+    parser.add_argument(
+        "--relatorio-a-cada",
+        type=int,
+        default=0,
+        metavar="N",
+        help="emite um relatório parcial a cada N posts",
+    )
+    parser.add_argument(
+        "--relatorio-intervalo",
+        type=float,
+        default=0,
+        metavar="T",
+        help="emite um relatório parcial a cada T segundos",
+    )
+    parser.add_argument(
+        "--cache",
+        default="../data/cache_sentimentos.sqlite",
+        metavar="ARQUIVO",
+        help="arquivo SQLite do cache de análises do modelo (usado com --llm)",
+    )
+    parser.add_argument(
+        "--sem-cache",
+        action="store_true",
+        help="desativa o cache de análises",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=7 * 24 * 3600,
+        metavar="SEGUNDOS",
+        help="validade de cada análise armazenada no cache",
+    )
+    parser.add_argument(
+        "--cache-max",
+        type=int,
+        default=100_000,
+        metavar="N",
+        help="máximo de análises mantidas no arquivo do cache",
+    )
+    parser.add_argument(
+        "--saida",
+        metavar="DIRETORIO",
+        help="diretório dos resultados (padrão: ../data/execucao_<data>)",
+    )
+    parser.add_argument(
+        "--retomar",
+        metavar="DIRETORIO",
+        help="continua uma execução interrompida a partir do último post gravado",
+    )
+    parser.add_argument(
+        "--formato-saida",
+        choices=list(EscritorResultados.FORMATOS),
+        default="jsonl",
+        help="formato dos arquivos de resultados",
+    )
+    parser.add_argument(
+        "--buffer",
+        type=int,
+        default=500,
+        metavar="N",
+        help="quantidade de resultados gravados por vez",
+    )
+    parser.add_argument(
+        "--rotacao-mb",
+        type=float,
+        default=100,
+        metavar="MB",
+        help="tamanho máximo de cada arquivo de resultados",
+    )
+    parser.add_argument(
+        "--rotacao-segundos",
+        type=float,
+        default=0,
+        metavar="T",
+        help="inicia um novo arquivo de resultados a cada T segundos",
+    )
+    parser.add_argument(
+        "--silencioso",
+        action="store_true",
+        help="não exibe as mensagens de cada post",
+    )
+    parser.add_argument(
+        "--metricas-json",
+        metavar="ARQUIVO",
+        help="exporta as métricas de desempenho em JSON",
+    )
+    parser.add_argument(
+        "--metricas-prometheus",
+        metavar="ARQUIVO",
+        help="exporta as métricas de desempenho no formato texto do Prometheus",
+    )
+    parser.add_argument(
+        "--concorrencia",
+        type=int,
+        default=pipeline_config["max_concorrencia"],
+        help="máximo de chamadas simultâneas ao modelo",
+    )
+    parser.add_argument(
+        "--posts-por-lote",
+        type=int,
+        default=pipeline_config["posts_por_lote"],
+        help="quantidade de posts enviados em cada prompt do analisador",
+    )
+    args = parser.parse_args()
+
+    pipeline_config["max_concorrencia"] = max(1, args.concorrencia)
+    pipeline_config["posts_por_lote"] = max(1, args.posts_por_lote)
+
     print("\nInicializando Sistema Multi-Agente...")
 
     # Criar e executar o sistema
-    sistema = SistemaAnaliseMultiAgente()
-    relatorio = sistema.executar()
+    posts = None
+    if args.entrada:
+        # Leitura encadeada: nenhum arquivo é carregado inteiro em memória
+        try:
+            fontes = [
+                ler_posts(caminho, args.formato, args.coluna)
+                for caminho in args.entrada
+            ]
+        except (OSError, ValueError) as erro:
+            parser.error(str(erro))
+        posts = itertools.chain.from_iterable(fontes)
+
+    # A análise por palavras-chave é mais rápida que o próprio cache
+    cache = None
+    if args.llm and not args.sem_cache:
+        cache = CacheSentimentos(
+            args.cache, ttl_segundos=args.cache_ttl, max_entradas=args.cache_max
+        )
+
+    if args.retomar and args.saida:
+        parser.error("--saida e --retomar não podem ser usados juntos")
+
+    diretorio_saida = args.retomar or args.saida
+    if diretorio_saida is None:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        diretorio_saida = f"../data/execucao_{timestamp}"
+        sufixo = 1
+        while os.path.exists(diretorio_saida):
+            diretorio_saida = f"../data/execucao_{timestamp}_{sufixo}"
+            sufixo += 1
+
+    # Identifica a entrada para que a retomada não pule posts de outra fonte
+    entrada = {"arquivos": None}
+    if args.entrada:
+        entrada = {
+            "arquivos": [
+                caminho if caminho == "-" else os.path.abspath(caminho)
+                for caminho in args.entrada
+            ],
+            "formato": args.formato,
+            "coluna": args.coluna,
+        }
+
+    try:
+        escritor = EscritorResultados(
+            diretorio_saida,
+            formato=args.formato_saida,
+            tamanho_buffer=max(1, args.buffer),
+            tamanho_max_mb=args.rotacao_mb,
+            intervalo_rotacao=args.rotacao_segundos,
+            entrada=entrada,
+            retomar=bool(args.retomar),
+        )
+    except ValueError as erro:
+        parser.error(str(erro))
+
+    sistema = SistemaAnaliseMultiAgente(
+        posts=posts,
+        usar_llm=args.llm,
+        offline=args.offline,
+        manter_resultados=False,
+        relatorio_a_cada=args.relatorio_a_cada,
+        relatorio_intervalo=args.relatorio_intervalo,
+        cache=cache,
+        escritor=escritor,
+        silencioso=args.silencioso,
+    )
+    try:
+        if args.assincrono:
+            import asyncio
+
+            relatorio = asyncio.run(sistema.executar_async())
+        else:
+            relatorio = sistema.executar()
+    finally:
+        if cache is not None:
+            cache.fechar()
+
+    if args.metricas_json:
+        sistema.metricas.exportar_json(args.metricas_json)
+        print(f"Métricas salvas em: {args.metricas_json}")
+    if args.metricas_prometheus:
+        sistema.metricas.exportar_prometheus(args.metricas_prometheus)
+        print(f"Métricas salvas em: {args.metricas_prometheus}")
 
 
 if __name__ == "__main__":
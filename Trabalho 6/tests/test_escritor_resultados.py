@@ -0,0 +1,151 @@
+"""Testes da gravação incremental e da retomada de execuções interrompidas
+
+Executar a partir de "Trabalho 6": python -m unittest discover tests
+"""
+
+import contextlib
+import glob
+import gzip
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import main  # noqa: E402
+
+FORMATOS = ("jsonl", "jsonl.gz")
+ENTRADA = {"arquivos": ["/dados/posts.jsonl"], "formato": "jsonl", "coluna": None}
+
+
+def ler_partes(diretorio):
+    """Lê os resultados de todas as partes, na ordem de gravação"""
+    resultados = []
+    for caminho in sorted(glob.glob(os.path.join(diretorio, "resultados_*"))):
+        abrir = gzip.open if caminho.endswith(".gz") else open
+        with abrir(caminho, "rt", encoding="utf-8") as f:
+            resultados.extend(json.loads(linha) for linha in f)
+    return resultados
+
+
+def posts_com_falha(posts, falhar_apos):
+    """Entrega os posts e simula uma queda do processo no meio da leitura"""
+    for i, post in enumerate(posts):
+        if i == falhar_apos:
+            raise RuntimeError("queda simulada")
+        yield post
+
+
+def abandonar(escritor):
+    """Descarta o escritor sem gravar o buffer, como em uma queda do processo"""
+    escritor._arquivo.close()
+
+
+class TestRetomada(unittest.TestCase):
+    def setUp(self):
+        self.diretorio = tempfile.TemporaryDirectory()
+        self.posts = [
+            "Adorei o produto" if i % 3 == 0 else f"Post comum {i}" for i in range(20)
+        ]
+
+    def tearDown(self):
+        self.diretorio.cleanup()
+
+    def saida(self, formato="jsonl"):
+        return os.path.join(self.diretorio.name, formato)
+
+    def escritor(self, formato="jsonl", retomar=False, entrada=ENTRADA):
+        # Partes de ~100 bytes: cada gravação de 3 posts abre uma nova parte
+        return main.EscritorResultados(
+            self.saida(formato),
+            formato=formato,
+            tamanho_buffer=3,
+            tamanho_max_mb=0.0001,
+            entrada=entrada,
+            retomar=retomar,
+        )
+
+    def executar(self, posts, escritor):
+        sistema = main.SistemaAnaliseMultiAgente(
+            posts=posts,
+            offline=True,
+            manter_resultados=False,
+            escritor=escritor,
+            silencioso=True,
+        )
+        with contextlib.redirect_stdout(io.StringIO()):
+            return sistema.executar()
+
+    def test_queda_e_retomada_gravam_cada_post_uma_vez(self):
+        for formato in FORMATOS:
+            with self.subTest(formato=formato):
+                escritor = self.escritor(formato)
+                with self.assertRaises(RuntimeError):
+                    self.executar(posts_com_falha(self.posts, 11), escritor)
+                abandonar(escritor)
+
+                # Apenas os lotes completos sobrevivem à queda
+                self.assertEqual(len(ler_partes(self.saida(formato))), 9)
+
+                relatorio = self.executar(
+                    iter(self.posts), self.escritor(formato, retomar=True)
+                )
+                resultados = ler_partes(self.saida(formato))
+
+                self.assertEqual(
+                    [r["indice"] for r in resultados], list(range(1, 21))
+                )
+                self.assertEqual(resultados[9]["post"], self.posts[9])
+                partes = glob.glob(os.path.join(self.saida(formato), "resultados_*"))
+                self.assertGreater(len(partes), 6)
+                self.assertEqual(relatorio["total_posts"], 20)
+                self.assertEqual(relatorio["estatisticas"]["positivos"]["quantidade"], 7)
+
+    def test_retomada_descarta_gravacao_incompleta(self):
+        for formato in FORMATOS:
+            with self.subTest(formato=formato):
+                escritor = self.escritor(formato)
+                for indice in (1, 2, 3):
+                    escritor.escrever(
+                        {"post": "p", "indice": indice, "sentimento": "NEUTRO"}
+                    )
+                caminho = escritor.caminho_atual
+                abandonar(escritor)
+
+                # Uma gravação interrompida deixa bytes após a posição salva
+                with open(caminho, "ab") as f:
+                    f.write(b'{"post": "p", "indice": 4, "sent')
+
+                escritor = self.escritor(formato, retomar=True)
+                self.assertEqual(escritor.posts_processados, 3)
+                self.assertEqual(os.path.getsize(caminho), escritor.estado["posicao"])
+                escritor.escrever({"post": "p", "indice": 4, "sentimento": "NEUTRO"})
+                escritor.fechar()
+
+                self.assertEqual(
+                    [r["indice"] for r in ler_partes(self.saida(formato))], [1, 2, 3, 4]
+                )
+
+    def test_retomada_com_outra_entrada_e_recusada(self):
+        self.escritor().fechar()
+        outra = dict(ENTRADA, arquivos=["/dados/outros.jsonl"])
+
+        with self.assertRaisesRegex(ValueError, "outra entrada"):
+            self.escritor(retomar=True, entrada=outra)
+
+    def test_retomada_sem_estado_e_recusada(self):
+        with self.assertRaisesRegex(ValueError, "não contém uma execução"):
+            self.escritor(retomar=True)
+
+    def test_diretorio_com_execucao_exige_retomar(self):
+        self.escritor().fechar()
+
+        with self.assertRaisesRegex(ValueError, "--retomar"):
+            self.escritor()
+
+
+if __name__ == "__main__":
+    unittest.main()
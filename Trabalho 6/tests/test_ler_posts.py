@@ -0,0 +1,82 @@
+"""Testes da leitura de posts em CSV, incluindo a escolha da coluna de texto
+
+Executar a partir de "Trabalho 6": python -m unittest discover tests
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import main  # noqa: E402
+
+
+class TestLerCsv(unittest.TestCase):
+    def setUp(self):
+        self.diretorio = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.diretorio.cleanup()
+
+    def arquivo(self, conteudo, nome="posts.csv"):
+        caminho = os.path.join(self.diretorio.name, nome)
+        with open(caminho, "w", encoding="utf-8", newline="") as f:
+            f.write(conteudo)
+        return caminho
+
+    def test_coluna_padrao_do_cabecalho(self):
+        caminho = self.arquivo(
+            'id, Texto ,autor\n1,"Adorei, excelente!",ana\n2,  ,bia\n3\n4,Péssimo,caio\n'
+        )
+
+        # Células vazias e linhas curtas demais são ignoradas
+        self.assertEqual(
+            list(main.ler_posts(caminho)), ["Adorei, excelente!", "Péssimo"]
+        )
+
+    def test_coluna_informada_tem_prioridade(self):
+        caminho = self.arquivo("texto,comentario\nignorado,Chegou rápido\n")
+
+        posts = main.ler_posts(caminho, coluna="Comentario")
+
+        self.assertEqual(list(posts), ["Chegou rápido"])
+
+    def test_cabecalho_sem_coluna_de_texto(self):
+        caminho = self.arquivo("id,nota\n1,5\n")
+
+        # O erro surge na chamada, antes de qualquer post ser consumido
+        with self.assertRaisesRegex(ValueError, "--coluna"):
+            main.ler_posts(caminho)
+        with self.assertRaisesRegex(ValueError, "comentario"):
+            main.ler_posts(caminho, coluna="comentario")
+
+    def test_csv_vazio(self):
+        self.assertEqual(list(main.ler_posts(self.arquivo(""))), [])
+
+    def test_formato_explicito_ignora_a_extensao(self):
+        caminho = self.arquivo("post\nProduto ok\n", nome="posts.txt")
+
+        self.assertEqual(list(main.ler_posts(caminho, "csv")), ["Produto ok"])
+
+    def test_linha_de_comando_recusa_csv_sem_coluna(self):
+        caminho = self.arquivo("id,nota\n1,5\n")
+        argumentos = ["main.py", "--offline", "--entrada", caminho]
+
+        erros = io.StringIO()
+        with mock.patch.object(sys, "argv", argumentos), mock.patch.dict(
+            main.pipeline_config
+        ), contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(erros):
+            with self.assertRaises(SystemExit) as saida:
+                main.main()
+
+        self.assertEqual(saida.exception.code, 2)
+        self.assertIn("--coluna", erros.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
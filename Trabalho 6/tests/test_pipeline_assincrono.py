@@ -0,0 +1,313 @@
+"""Testes do pipeline assíncrono contra um servidor de modelo local (stub)
+
+Executar a partir de "Trabalho 6": python -m unittest discover tests
+"""
+
+import asyncio
+import contextlib
+import io
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import main  # noqa: E402
+
+try:
+    import openai  # noqa: F401
+except ImportError:
+    openai = None
+
+
+class StubModelo(BaseHTTPRequestHandler):
+    """Servidor compatível com /chat/completions que responde NEUTRO a todos os posts
+
+    Cada requisição consome um comportamento de `roteiro` ("ok" quando vazio):
+    "sem_bloco" omite o último post, "lento" excede o timeout, e "erro500" /
+    "erro400" respondem com o status correspondente.
+    """
+
+    roteiro = []
+    requisicoes = 0
+    instantes = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        corpo = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        StubModelo.requisicoes += 1
+        StubModelo.instantes.append(time.monotonic())
+        comportamento = StubModelo.roteiro.pop(0) if StubModelo.roteiro else "ok"
+
+        if comportamento in ("erro500", "erro400"):
+            self._responder(int(comportamento[-3:]), {"error": {"message": "stub"}})
+            return
+        if comportamento == "lento":
+            time.sleep(1)
+
+        prompt = corpo["messages"][-1]["content"]
+        numeros = re.findall(r"^POST (\d+):", prompt, re.MULTILINE)
+        if comportamento == "sem_bloco":
+            numeros = numeros[:-1]
+
+        texto = "\n".join(
+            f"POST {numero}:\nSENTIMENTO: [NEUTRO]\nCONFIANÇA: 77%\n"
+            f"JUSTIFICATIVA: resposta do stub"
+            for numero in numeros
+        )
+        self._responder(
+            200,
+            {
+                "id": "stub",
+                "object": "chat.completion",
+                "created": 0,
+                "model": "gpt-4",
+                "choices": [
+                    {
+                        "index": 0,
+                        "finish_reason": "stop",
+                        "message": {"role": "assistant", "content": texto},
+                    }
+                ],
+            },
+        )
+
+    def _responder(self, status, dados):
+        conteudo = json.dumps(dados).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(conteudo)))
+        self.end_headers()
+        self.wfile.write(conteudo)
+
+
+class TestInterpretarResposta(unittest.TestCase):
+    def setUp(self):
+        self.sistema = main.SistemaAnaliseMultiAgente(offline=True)
+
+    def test_blocos_por_post(self):
+        resposta = (
+            "POST 1:\nSENTIMENTO: POSITIVO\nCONFIANÇA: 90%\nJUSTIFICATIVA: elogio\n\n"
+            "**POST 2:**\nSENTIMENTO: [negativo]\nCONFIANCA: [65]%\n"
+            "JUSTIFICATIVA: [reclamação]"
+        )
+        resultados = self.sistema._interpretar_resposta_lote(
+            resposta, [(0, "primeiro"), (1, "segundo")]
+        )
+
+        self.assertEqual(
+            [(r["indice"], r["sentimento"], r["confianca"]) for r in resultados],
+            [(1, "POSITIVO", 90), (2, "NEGATIVO", 65)],
+        )
+        self.assertEqual(resultados[1]["justificativa"], "reclamação")
+
+    def test_post_unico_sem_cabecalho(self):
+        resposta = "SENTIMENTO: NEUTRO\nCONFIANÇA: 50%\nJUSTIFICATIVA: ok"
+        (resultado,) = self.sistema._interpretar_resposta_lote(resposta, [(4, "post")])
+
+        self.assertEqual(resultado["sentimento"], "NEUTRO")
+        self.assertEqual(resultado["indice"], 5)
+
+    def test_bloco_ausente_usa_fallback(self):
+        resposta = "POST 1:\nSENTIMENTO: NEUTRO\nCONFIANÇA: 50%\nJUSTIFICATIVA: ok"
+        resultados = self.sistema._interpretar_resposta_lote(
+            resposta, [(0, "Produto ok"), (1, "Adorei, excelente!")]
+        )
+
+        self.assertEqual(resultados[1]["sentimento"], "POSITIVO")
+        self.assertIsNone(resultados[1]["confianca"])
+        self.assertFalse(resultados[1]["_armazenavel"])
+
+
+@unittest.skipIf(openai is None, "o pacote openai não está instalado")
+class TestPipelineComStub(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.servidor = ThreadingHTTPServer(("127.0.0.1", 0), StubModelo)
+        cls.servidor.daemon_threads = True
+        threading.Thread(target=cls.servidor.serve_forever, daemon=True).start()
+
+        cls.configuracao_original = dict(main.config_list[0])
+        cls.pipeline_original = dict(main.pipeline_config)
+        main.config_list[0]["api_key"] = "stub"
+        main.config_list[0]["base_url"] = (
+            f"http://127.0.0.1:{cls.servidor.server_address[1]}/v1"
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.servidor.shutdown()
+        cls.servidor.server_close()
+        main.config_list[0].clear()
+        main.config_list[0].update(cls.configuracao_original)
+        main.pipeline_config.clear()
+        main.pipeline_config.update(cls.pipeline_original)
+
+    def setUp(self):
+        main.pipeline_config.update(self.pipeline_original)
+        main.pipeline_config.update(
+            {"posts_por_lote": 3, "tentativas": 2, "backoff_inicial": 0.01}
+        )
+        StubModelo.roteiro = []
+        StubModelo.requisicoes = 0
+        StubModelo.instantes = []
+        self.diretorio = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.diretorio.cleanup()
+
+    def executar(self, posts, cache=None):
+        saida = tempfile.mkdtemp(dir=self.diretorio.name)
+        sistema = main.SistemaAnaliseMultiAgente(
+            posts=posts,
+            usar_llm=True,
+            cache=cache,
+            escritor=main.EscritorResultados(saida),
+            silencioso=True,
+        )
+        with contextlib.redirect_stdout(io.StringIO()):
+            relatorio = asyncio.run(sistema.executar_async())
+        return sistema.resultados, relatorio
+
+    def test_lotes_interpretados_em_ordem(self):
+        posts = [f"Post número {i}" for i in range(7)]
+        resultados, relatorio = self.executar(posts)
+
+        self.assertEqual(StubModelo.requisicoes, 3)
+        self.assertEqual([r["indice"] for r in resultados], list(range(1, 8)))
+        self.assertTrue(all(r["confianca"] == 77 for r in resultados))
+        self.assertEqual(relatorio["estatisticas"]["neutros"]["quantidade"], 7)
+
+    def test_bloco_ausente_usa_fallback(self):
+        StubModelo.roteiro = ["sem_bloco"]
+        resultados, _ = self.executar(["Produto ok", "Chegou", "Adorei, excelente!"])
+
+        self.assertEqual([r["confianca"] for r in resultados], [77, 77, None])
+        self.assertEqual(resultados[2]["sentimento"], "POSITIVO")
+
+    def test_timeout_esgota_tentativas(self):
+        main.pipeline_config["timeout"] = 0.2
+        StubModelo.roteiro = ["lento", "lento"]
+        resultados, _ = self.executar(["Produto ok"])
+
+        self.assertEqual(StubModelo.requisicoes, 2)
+        self.assertIn("fallback", resultados[0]["justificativa"])
+
+    def test_erro_5xx_e_repetido(self):
+        StubModelo.roteiro = ["erro500"]
+        resultados, _ = self.executar(["Produto ok"])
+
+        self.assertEqual(StubModelo.requisicoes, 2)
+        self.assertEqual(resultados[0]["confianca"], 77)
+
+    def test_erro_4xx_nao_e_repetido(self):
+        StubModelo.roteiro = ["erro400"]
+        resultados, _ = self.executar(["Produto ok"])
+
+        self.assertEqual(StubModelo.requisicoes, 1)
+        self.assertIn("fallback", resultados[0]["justificativa"])
+
+    def test_entrada_lenta_nao_bloqueia_o_modelo(self):
+        main.pipeline_config.update({"posts_por_lote": 1, "timeout": 0.3})
+        fim_da_entrada = []
+
+        def posts_lentos():
+            for i in range(3):
+                if i:
+                    time.sleep(0.5)
+                yield f"Post lento {i}"
+            fim_da_entrada.append(time.monotonic())
+
+        resultados, _ = self.executar(posts_lentos())
+
+        # Cada post chega ao modelo enquanto a entrada ainda está sendo lida,
+        # e as pausas na leitura não estouram o timeout das chamadas
+        self.assertEqual(StubModelo.requisicoes, 3)
+        self.assertLess(StubModelo.instantes[0], fim_da_entrada[0])
+        self.assertEqual([r["confianca"] for r in resultados], [77, 77, 77])
+
+    def test_cache_guarda_apenas_respostas_do_modelo(self):
+        cache = main.CacheSentimentos(os.path.join(self.diretorio.name, "cache.sqlite"))
+        posts = ["Produto ok", "Adorei, excelente!"]
+        try:
+            StubModelo.roteiro = ["sem_bloco"]
+            self.executar(posts, cache)
+            self.assertEqual(StubModelo.requisicoes, 1)
+
+            # O post que caiu no fallback volta ao modelo; o outro vem do cache
+            resultados, relatorio = self.executar(posts, cache)
+        finally:
+            cache.fechar()
+
+        self.assertEqual(StubModelo.requisicoes, 2)
+        self.assertEqual([r["sentimento"] for r in resultados], ["NEUTRO", "NEUTRO"])
+        self.assertEqual(relatorio["cache"]["acertos"], 1)
+
+    def test_cache_guarda_apenas_a_latencia_do_modelo(self):
+        main.pipeline_config["backoff_inicial"] = 0.5
+        cache = main.CacheSentimentos(os.path.join(self.diretorio.name, "cache.sqlite"))
+        posts = ["Produto ok", "Chegou"]
+        try:
+            StubModelo.roteiro = ["erro500"]
+            self.executar(posts, cache)
+            _, relatorio = self.executar(posts, cache)
+        finally:
+            cache.fechar()
+
+        # O backoff entre as tentativas não conta como latência economizada
+        self.assertEqual(relatorio["cache"]["acertos"], 2)
+        self.assertLess(relatorio["cache"]["latencia_economizada_s"], 0.25)
+
+    def test_retomada_pula_posts_ja_gravados(self):
+        main.pipeline_config["posts_por_lote"] = 2
+        saida = os.path.join(self.diretorio.name, "execucao")
+        posts = [f"Post número {i}" for i in range(12)]
+
+        def posts_com_falha():
+            yield from posts[:8]
+            # Tempo para os 8 posts lidos serem analisados e gravados
+            time.sleep(0.5)
+            raise RuntimeError("queda simulada")
+
+        def executar(entrada, retomar):
+            escritor = main.EscritorResultados(
+                saida, tamanho_buffer=2, entrada={"teste": 1}, retomar=retomar
+            )
+            sistema = main.SistemaAnaliseMultiAgente(
+                posts=entrada, usar_llm=True, escritor=escritor, silencioso=True
+            )
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    asyncio.run(asyncio.wait_for(sistema.executar_async(), timeout=10))
+            finally:
+                # Após a queda o buffer é descartado sem ser gravado
+                escritor._arquivo.close()
+            return sistema
+
+        with self.assertRaises(RuntimeError):
+            executar(posts_com_falha(), retomar=False)
+        StubModelo.requisicoes = 0
+
+        sistema = executar(iter(posts), retomar=True)
+
+        self.assertEqual(sistema.inicio, 8)
+        self.assertEqual(StubModelo.requisicoes, 2)
+        self.assertEqual([r["indice"] for r in sistema.resultados], list(range(9, 13)))
+        gravados = []
+        for caminho in sorted(os.listdir(saida)):
+            if caminho.startswith("resultados_"):
+                with open(os.path.join(saida, caminho), encoding="utf-8") as f:
+                    gravados.extend(json.loads(linha)["indice"] for linha in f)
+        self.assertEqual(gravados, list(range(1, 13)))
+
+
+if __name__ == "__main__":
+    unittest.main()